@@ -1,14 +1,108 @@
 # board.py
 import numpy as np
-import matplotlib.pyplot as plt
+
+try:
+    # Optional compiled move application (board_core.pyx, built with: cythonize -i board_core.pyx)
+    from board_core import apply_move as _core_apply_move
+except ImportError:
+    _core_apply_move = None
+
+# Bitboard layout: each player's stones are stored in one 81-bit integer.
+# Subgrid k occupies bits 9*k .. 9*k+8, and the cell at local (r, c) inside
+# that subgrid is bit 9*k + 3*r + c, so a whole subgrid is one shift + mask away.
+SG_FULL_MASK = 0x1FF  # All 9 cells of a subgrid
+SG_SHIFT = tuple(9 * k for k in range(9))  # Bit offset of each subgrid
+SG_MASK = tuple(SG_FULL_MASK << shift for shift in SG_SHIFT)  # Bits of each subgrid in the 81-bit board
+BOARD_FULL_MASK = (1 << 81) - 1  # All 81 cells
+
+# Flat 9x9 index (row * 9 + col) -> bit position in the bitboard
+CELL_TO_BIT = tuple(((row // 3) * 3 + col // 3) * 9 + (row % 3) * 3 + col % 3
+                    for row in range(9) for col in range(9))
+BIT_TO_CELL = tuple(CELL_TO_BIT.index(bit) for bit in range(81))  # Inverse of CELL_TO_BIT
+_CELL_TO_BIT_ARRAY = np.array(CELL_TO_BIT)
+_BIT_TO_CELL_ARRAY = np.argsort(_CELL_TO_BIT_ARRAY)  # Reorders a flat 9x9 board into subgrid-major order
+_LOCAL_INDEX = np.arange(9, dtype=np.uint16)  # Bit positions of the cells inside a subgrid
+
+# Flat 9x9 index -> subgrid containing the cell, and subgrid the next move is sent to
+CELL_TO_SG = tuple((row // 3) * 3 + col // 3 for row in range(9) for col in range(9))
+CELL_TO_NEXT_SG = tuple((row % 3) * 3 + col % 3 for row in range(9) for col in range(9))
+
+# The 8 winning lines of a 3x3 subgrid as 9-bit masks (rows, columns, diagonals)
+SUBGRID_LINES = (
+    0b111_000_000, 0b000_111_000, 0b000_000_111,  # Rows
+    0b100_100_100, 0b010_010_010, 0b001_001_001,  # Columns
+    0b100_010_001, 0b001_010_100,                 # Diagonals
+)
+
+# The same 8 lines spread onto the 2-bit-per-subgrid layout of Board.sgw_packed
+# (subgrid k at bits 2k and 2k+1), to test the subgrids won by one player
+SGW_LINES = tuple(sum(1 << (2 * k) for k in range(9) if (line >> k) & 1) for line in SUBGRID_LINES)
+
+# The lines passing through each of the 9 positions (2 to 4 each), for checking only
+# the lines a move can have completed: per cell of a subgrid and per subgrid of sgw_packed
+LINES_THROUGH = tuple(tuple(line for line in SUBGRID_LINES if (line >> pos) & 1) for pos in range(9))
+SGW_LINES_THROUGH = tuple(tuple(line for line in SGW_LINES if (line >> (2 * pos)) & 1) for pos in range(9))
+
+# The same 8 lines as local cell indices (8x3), for testing numpy boards
+LINES_SG = np.array([[i for i in range(9) if (line >> i) & 1] for line in SUBGRID_LINES], dtype=np.uint8)
+
+# Flat 9x9 indices of the cells of each subgrid (in local order) and of each of its 8 lines
+_SUBGRID_CELLS = _BIT_TO_CELL_ARRAY.reshape(9, 9)
+_SUBGRID_LINE_CELLS = _SUBGRID_CELLS[:, LINES_SG]  # Shape (9 subgrids, 8 lines, 3 cells)
+_CELL_TO_SG_ARRAY = np.array(CELL_TO_SG)
+_CELL_TO_NEXT_SG_ARRAY = np.array(CELL_TO_NEXT_SG)
+
+
+def _unpack_bits(bits):
+    """
+    Unpack an 81-bit integer into an array of 81 zeros and ones (indexed by bit position).
+    """
+    raw = np.frombuffer(bits.to_bytes(11, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder='little')[:81]
+
+
+def subgrid_winners(board):
+    """
+    Compute the winner of every subgrid of a 9x9 numpy board in one vectorized pass.
+    Returns an array of 9 values: 0 = not won, 1 = Player 1, 2 = Player 2.
+    A raw array cannot tell who completed a line first, so where both players have a line in
+    a subgrid Player 1 is reported. Board.subgrid_wins keeps the first player to complete one
+    and can differ there.
+    """
+    lines = np.asarray(board).reshape(-1)[_SUBGRID_LINE_CELLS]  # Shape (9 subgrids, 8 lines, 3 cells)
+    p1_wins = (lines == 1).all(axis=2).any(axis=1)
+    p2_wins = (lines == 2).all(axis=2).any(axis=1)
+    return np.where(p1_wins, 1, np.where(p2_wins, 2, 0)).astype(np.uint8)
+
 
 class Board:
+    # Fixed attribute layout: no per-instance __dict__, which matters when search keeps many boards alive
+    __slots__ = ('bits', 'sgw_packed', 'overall_winner', 'next_subgrid', 'history', '_legal_cache')
+
     def __init__(self):
-        # Initialize the overall 9x9 grid (9 sub-grids, each 3x3)
-        self.board = np.zeros((9, 9), dtype=int)  # Overall 9x9 board
-        self.subgrid_wins = [0] * 9  # Track wins for each subgrid: 0 = not won, 1 = Player 1, 2 = Player 2
+        # Initialize the overall 9x9 grid (9 sub-grids, each 3x3) as two bitboards
+        self.bits = [0, 0]  # Occupied cells of Player 1 and Player 2 (indexed by player - 1)
+        self.sgw_packed = 0  # Track wins for each subgrid in 2 bits per subgrid (bits 2k, 2k+1): 0 = not won, 1 = Player 1, 2 = Player 2
         self.overall_winner = 0  # Track the overall winner: 0 = none, 1 = Player 1, 2 = Player 2
         self.next_subgrid = None  # Tracks the subgrid where the next move must be made
+        self._legal_cache = None  # Cached legal_mask(), cleared whenever the position changes
+        self.history = []  # Stack of (index, player, next_subgrid, sgw_packed, overall_winner) for unmake_move
+
+    def freeze(self):
+        """
+        Get an immutable, hashable snapshot of the position, e.g. as a transposition table key.
+        sgw_packed and overall_winner are included because a subgrid (or the game) in which both
+        players have a line belongs to whoever completed theirs first, which the stones alone do not tell.
+        """
+        return self.bits[0], self.bits[1], self.sgw_packed, self.next_subgrid, self.overall_winner
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.freeze() == other.freeze()
+
+    # A Board changes with every move, so it is deliberately unhashable; hash freeze() instead
+    __hash__ = None
 
     def index_to_position(self, index, size):
         """
@@ -20,13 +114,53 @@ class Board:
         col = index % size
         return row, col
 
+    @property
+    def subgrid_wins(self):
+        """
+        The winner of each subgrid as a list of 9 values: 0 = not won, 1 = Player 1, 2 = Player 2.
+        """
+        return [self._sgw_get(k) for k in range(9)]
+
+    def _sgw_get(self, subgrid_index):
+        """
+        Get the winner of a subgrid from the packed subgrid wins.
+        """
+        return (self.sgw_packed >> (2 * subgrid_index)) & 3
+
+    def _sgw_set(self, subgrid_index, winner):
+        """
+        Set the winner of a subgrid in the packed subgrid wins.
+        """
+        shift = 2 * subgrid_index
+        self.sgw_packed = (self.sgw_packed & ~(3 << shift)) | (int(winner) << shift)  # int() keeps numpy scalars out
+
+    @property
+    def board(self):
+        """
+        The overall 9x9 board as a uint8 numpy array (0 = empty, 1 = Player 1, 2 = Player 2).
+        It is unpacked from the bitboards on every access, so writing to it has no effect;
+        use update_cell or set_subgrid to change the state.
+        """
+        flat = _unpack_bits(self.bits[0]) + 2 * _unpack_bits(self.bits[1])
+        return flat[_CELL_TO_BIT_ARRAY].reshape(9, 9)
+
+    def get_subgrid_bits(self, subgrid_index):
+        """
+        Get the cells of a specific subgrid (0-8) as two 9-bit integers,
+        one for Player 1 and one for Player 2. Bit 3*r + c is the local cell (r, c).
+        """
+        shift = SG_SHIFT[subgrid_index]
+        return (self.bits[0] >> shift) & SG_FULL_MASK, (self.bits[1] >> shift) & SG_FULL_MASK
+
     def get_subgrid(self, subgrid_index):
         """
         Get a specific 3x3 subgrid by index (0-8).
+        It is rebuilt from the subgrid's bits, so it is a copy; use set_subgrid to write it back.
+        Game logic works on get_subgrid_bits instead.
         """
-        row_start = (subgrid_index // 3) * 3  # Row of the top-left corner of the subgrid
-        col_start = (subgrid_index % 3) * 3   # Column of the top-left corner of the subgrid
-        return self.board[row_start:row_start + 3, col_start:col_start + 3]
+        p1_bits, p2_bits = self.get_subgrid_bits(subgrid_index)
+        cells = ((p1_bits >> _LOCAL_INDEX) & 1) + 2 * ((p2_bits >> _LOCAL_INDEX) & 1)
+        return cells.astype(np.uint8).reshape(3, 3)
 
     def set_subgrid(self, subgrid_index, subgrid):
         """
@@ -36,9 +170,17 @@ class Board:
         if subgrid.shape != (3, 3):
             raise ValueError("Subgrid must be a 3x3 numpy array")
 
-        row_start = (subgrid_index // 3) * 3
-        col_start = (subgrid_index % 3) * 3
-        self.board[row_start:row_start + 3, col_start:col_start + 3] = subgrid
+        p1_bits = p2_bits = 0
+        for local_index, value in enumerate(subgrid.flat):
+            if value == 1:
+                p1_bits |= 1 << local_index
+            elif value == 2:
+                p2_bits |= 1 << local_index
+
+        shift = SG_SHIFT[subgrid_index]
+        self._legal_cache = None
+        self.bits[0] = (self.bits[0] & ~SG_MASK[subgrid_index]) | (p1_bits << shift)
+        self.bits[1] = (self.bits[1] & ~SG_MASK[subgrid_index]) | (p2_bits << shift)
 
 
     def is_valid_move(self, row, col):
@@ -46,13 +188,39 @@ class Board:
         Check if a move is valid by checking if the corresponding subgrid is available 
         and the cell is empty.
         """
+        if not (0 <= row < 9 and 0 <= col < 9):
+            raise IndexError(f"Cell ({row}, {col}) is outside the 9x9 board.")
+
         # Check if move is in the valid subgrid, unless it's a free move
-        if self.next_subgrid is not None:
-            subgrid_row, subgrid_col = row // 3, col // 3
-            if subgrid_row * 3 + subgrid_col != self.next_subgrid:
-                return False
+        index = row * 9 + col
+        if self.next_subgrid is not None and CELL_TO_SG[index] != self.next_subgrid:
+            return False
 
-        return self.board[row, col] == 0
+        bit = CELL_TO_BIT[index]
+        return ((self.bits[0] | self.bits[1]) >> bit) & 1 == 0
+
+    def legal_mask(self):
+        """
+        Get all legal moves as one 81-bit integer in bitboard layout (see CELL_TO_BIT):
+        the empty cells of the next subgrid, or of the whole board on a free move.
+        The result is cached until the position changes.
+        """
+        if self._legal_cache is None:
+            empty = ~(self.bits[0] | self.bits[1]) & BOARD_FULL_MASK
+            if self.next_subgrid is not None:
+                empty &= SG_MASK[self.next_subgrid]
+            self._legal_cache = empty
+        return self._legal_cache
+
+    def legal_moves(self):
+        """
+        Yield the flat indices (0-80) of all legal moves, scanning only the set bits of legal_mask().
+        """
+        mask = self.legal_mask()
+        while mask:
+            low_bit = mask & -mask
+            yield BIT_TO_CELL[low_bit.bit_length() - 1]
+            mask ^= low_bit
 
     def update_cell(self, index, value):
         """
@@ -70,18 +238,44 @@ class Board:
         if not self.is_valid_move(row, col):
             raise ValueError(f"Invalid move: Cell at index {index} is already occupied.")
         
+        # An empty cell stays empty for value 0, but the move still sets the next subgrid
+        if value:
+            self.update_cell_unchecked(index, value)
+        else:
+            self._set_next_subgrid(CELL_TO_NEXT_SG[index])
+
+    def update_cell_unchecked(self, index, value):
+        """
+        Play a move for value (1 = Player 1, 2 = Player 2) at a flat index (0-80) without validating it.
+        The caller must pass a legal move; RL training and search should use this instead of update_cell.
+        Uses the compiled board_core module when it has been built.
+        """
+        value = int(value)  # A numpy scalar (e.g. read from BatchedBoards) would turn the packed state into a fixed-width int
+        if _core_apply_move is not None:
+            self.bits[0], self.bits[1], self.sgw_packed, next_subgrid, winner = _core_apply_move(
+                self.bits[0], self.bits[1], self.sgw_packed, index, value)
+            self.next_subgrid = None if next_subgrid < 0 else next_subgrid
+            if winner and not self.overall_winner:  # The first overall winner is final
+                self.overall_winner = winner
+            self._legal_cache = None
+            return
+
         # Update the main 9x9 board
-        self.board[row, col] = value
+        self.bits[value - 1] |= 1 << CELL_TO_BIT[index]
 
-        # Check the winner for the subgrid
-        subgrid_index = (row // 3) * 3 + (col // 3)
-        self.check_subgrid_winner(subgrid_index)
+        # Check the winner for the subgrid if it is still open, looking only at lines through the new stone
+        subgrid_index = CELL_TO_SG[index]
+        local_index = CELL_TO_NEXT_SG[index]  # The position inside the subgrid also picks the next subgrid
+        won = None
+        if (self.sgw_packed >> (2 * subgrid_index)) & 3 == 0:  # Skip the call for a decided subgrid
+            won = self.check_subgrid_winner(subgrid_index, local_index, value)
 
         # Update the next subgrid based on this move
-        self.update_next_subgrid(row, col)
+        self._set_next_subgrid(local_index)
 
-        # Check overall winner after every move
-        self.check_winner(value)
+        # The overall winner can only change when this move won its subgrid
+        if won:
+            self.check_winner(value, subgrid_index)
 
     def update_cell_in_subgrid(self, subgrid_index, subgrid_index_flat, value):
         """
@@ -110,63 +304,73 @@ class Board:
             raise ValueError(f"Invalid move: Cell in subgrid {subgrid_index}, index {subgrid_index_flat} is already occupied.")
 
         # Update the corresponding cell in the 9x9 board
-        self.board[global_row, global_col] = value
-
-        # Check the winner for the subgrid
-        self.check_subgrid_winner(subgrid_index)
+        index = global_row * 9 + global_col
+        if value:
+            self.update_cell_unchecked(index, value)
+        else:
+            self._set_next_subgrid(subgrid_index_flat)
 
-         # Update the next subgrid restriction based on the current move
-        self.update_next_subgrid(global_row, global_col)
+    def make_move(self, index, player):
+        """
+        Play a legal move at a flat index (0-80) and remember how to undo it.
+        Search code can make and unmake moves on a single Board instead of copying it per node.
+        """
+        self.history.append((index, player, self.next_subgrid, self.sgw_packed, self.overall_winner))
+        self.update_cell_unchecked(index, player)
 
-        # Check overall winner after every move
-        self.check_winner(value)
+    def unmake_move(self):
+        """
+        Undo the last move played with make_move.
+        """
+        index, player, self.next_subgrid, self.sgw_packed, self.overall_winner = self.history.pop()
+        self._legal_cache = None
+        self.bits[player - 1] ^= 1 << CELL_TO_BIT[index]
 
-    def check_winner(self, player):
+    def check_winner(self, player, subgrid_index=None):
         """
-        Check if the given player has won the overall board or any subgrid.
+        Check if the given player has won the overall board,
+        i.e. won three subgrids in a row, column or diagonal.
+        If subgrid_index is the subgrid the player just won, only the lines through it are checked.
+        The first overall winner is final: once it is set, a later line by the other player does not replace it.
         """
-        # Check rows and columns for overall board
-        for i in range(9):
-            if all(self.board[i, j] == player for j in range(9)):  # Check row
-                self.overall_winner = player
-                return True
-            if all(self.board[j, i] == player for j in range(9)):  # Check column
+        if self.overall_winner:
+            return self.overall_winner == player
+
+        won_bits = self.sgw_packed >> (player - 1)  # Low bit of each 2-bit field is set if the player won it
+        lines = SGW_LINES if subgrid_index is None else SGW_LINES_THROUGH[subgrid_index]
+        for line in lines:
+            if won_bits & line == line:
                 self.overall_winner = player
                 return True
 
-        # Check diagonals for overall board
-        if all(self.board[i, i] == player for i in range(9)):  # Main diagonal
-            self.overall_winner = player
-            return True
-        if all(self.board[i, 8 - i] == player for i in range(9)):  # Anti-diagonal
-            self.overall_winner = player
-            return True
-
         return False
 
-    def check_subgrid_winner(self, subgrid_index):
+    def check_subgrid_winner(self, subgrid_index, local_index=None, player=None):
         """
         Check if there is a winner in a specific subgrid.
+        If the local cell index (0-8) and player of the last move are given, only that player's
+        lines through that cell are checked, since no other line can have been completed by the move;
+        a subgrid that already has a winner keeps it and None is returned.
         """
-        subgrid = self.get_subgrid(subgrid_index)
-
-        for player in [1, 2]:
-            # Check rows and columns for subgrid
-            for i in range(3):
-                if all(subgrid[i, j] == player for j in range(3)):  # Check row
-                    self.subgrid_wins[subgrid_index] = player
-                    return player
-                if all(subgrid[j, i] == player for j in range(3)):  # Check column
-                    self.subgrid_wins[subgrid_index] = player
+        shift = SG_SHIFT[subgrid_index]
+        if local_index is not None:
+            if self._sgw_get(subgrid_index) != 0:
+                return None
+            player_bits = (self.bits[player - 1] >> shift) & SG_FULL_MASK
+            for line in LINES_THROUGH[local_index]:
+                if player_bits & line == line:
+                    self._sgw_set(subgrid_index, player)
                     return player
+            return None
 
-            # Check diagonals for subgrid
-            if all(subgrid[i, i] == player for i in range(3)):  # Main diagonal
-                self.subgrid_wins[subgrid_index] = player
-                return player
-            if all(subgrid[i, 2 - i] == player for i in range(3)):  # Anti-diagonal
-                self.subgrid_wins[subgrid_index] = player
-                return player
+        p1_bits = (self.bits[0] >> shift) & SG_FULL_MASK
+        p2_bits = (self.bits[1] >> shift) & SG_FULL_MASK
+
+        for player, player_bits in ((1, p1_bits), (2, p2_bits)):
+            for line in SUBGRID_LINES:
+                if player_bits & line == line:
+                    self._sgw_set(subgrid_index, player)
+                    return player
 
         return None  # No winner in this subgrid
 
@@ -174,16 +378,23 @@ class Board:
         """
         Check if a specific subgrid is full (i.e., no available moves).
         """
-        subgrid = self.get_subgrid(subgrid_index)
-        return np.all(subgrid != 0)
+        occupied = self.bits[0] | self.bits[1]
+        return (occupied >> SG_SHIFT[subgrid_index]) & SG_FULL_MASK == SG_FULL_MASK
     
     def update_next_subgrid(self, row, col):
         """
         Update the next subgrid based on the position of the last move.
         """
         # Determine the subgrid index where the next move should be made
-        next_subgrid = (row % 3) * 3 + (col % 3)
-        if self.is_subgrid_full(next_subgrid) or self.subgrid_wins[next_subgrid] != 0:
+        self._set_next_subgrid(CELL_TO_NEXT_SG[row * 9 + col])
+
+    def _set_next_subgrid(self, next_subgrid):
+        """
+        Send the next move to the given subgrid, or allow a free move if it is full or won.
+        Every move ends here, so this also clears the legal move cache.
+        """
+        self._legal_cache = None
+        if self.is_subgrid_full(next_subgrid) or self._sgw_get(next_subgrid) != 0:
             self.next_subgrid = None  # Free play if the next subgrid is full or won
         else:
             self.next_subgrid = next_subgrid
@@ -208,19 +419,24 @@ class Board:
         """
         Print the 9x9 overall board with separation between subgrids.
         """
+        board = self.board  # Unpack the bitboards once
         print("Ultimate Tic-Tac-Toe Board (9x9):\n")
         for i in range(3):  # Iterate over 3 rows of subgrids
             for row in range(3):  # Each row within subgrid
                 row_display = ""
                 for j in range(3):  # Iterate over 3 columns of subgrids
-                    row_display += " ".join(map(str, self.board[i * 3 + row, j * 3:j * 3 + 3])) + " | "
+                    row_display += " ".join(map(str, board[i * 3 + row, j * 3:j * 3 + 3])) + " | "
                 print(row_display)
             print("-" * 20)
     
     def plot_board(self):
         """
         Plot the current state of the 9x9 board using matplotlib.
+        matplotlib is imported here so that code which never renders does not pay for it.
         """
+        import matplotlib.pyplot as plt
+
+        cells = self.board.ravel().tolist()  # Unpack the bitboards once, as plain ints in flat 9x9 order
         plt.figure(figsize=(8, 8))
         plt.title("Ultimate Tic-Tac-Toe Board")
 
@@ -241,13 +457,75 @@ class Board:
                 # Center the markers in their respective cells
                 center_x = j + 0.5
                 center_y = 8.45 - i
-                if self.board[i, j] == 1:
+                cell = cells[i * 9 + j]
+                if cell == 1:
                     plt.text(center_x, center_y, 'X', fontsize=40, ha='center', va='center', color='blue')
-                elif self.board[i, j] == 2:
+                elif cell == 2:
                     plt.text(center_x, center_y, 'O', fontsize=40, ha='center', va='center', color='red')
 
         plt.xlim(0, 9)
         plt.ylim(0, 9)
         plt.grid(False)
         plt.gca().set_aspect('equal', adjustable='box')  # Maintain aspect ratio
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+
+class BatchedBoards:
+    """
+    N games of Ultimate Tic-Tac-Toe stored as stacked numpy arrays, so self-play can
+    advance every game with one vectorized step instead of a Python loop over Boards.
+    Board stays the single-game class for play and display.
+    """
+
+    def __init__(self, n):
+        self.board = np.zeros((n, 81), dtype=np.uint8)  # Flat 9x9 board of each game (0 = empty, 1 = Player 1, 2 = Player 2)
+        self.sgw = np.zeros((n, 9), dtype=np.uint8)  # Winner of each subgrid of each game
+        self.next_sg = np.full(n, -1, dtype=np.int8)  # Subgrid where the next move must be made (-1 = free move)
+        self.winner = np.zeros(n, dtype=np.uint8)  # Overall winner of each game (0 = none)
+
+    def __len__(self):
+        return len(self.board)
+
+    def reset(self, mask=None):
+        """
+        Reset all games, or only the games selected by a boolean mask of length N.
+        """
+        if mask is None:
+            mask = slice(None)
+        self.board[mask] = 0
+        self.sgw[mask] = 0
+        self.next_sg[mask] = -1
+        self.winner[mask] = 0
+
+    def legal_mask(self):
+        """
+        Get the legal moves of every game as a boolean array of shape (N, 81).
+        """
+        allowed = (self.next_sg[:, None] < 0) | (_CELL_TO_SG_ARRAY[None, :] == self.next_sg[:, None])
+        return (self.board == 0) & allowed
+
+    def apply(self, moves, player):
+        """
+        Play one move per game for the same player (1 or 2).
+        moves holds a flat index (0-80) for each game; every move must be legal.
+        """
+        moves = np.asarray(moves)
+        games = np.arange(len(self.board))
+        self.board[games, moves] = player
+
+        # Check the subgrid of each move, unless it is already decided
+        subgrids = _CELL_TO_SG_ARRAY[moves]
+        lines = self.board[games[:, None, None], _SUBGRID_LINE_CELLS[subgrids]]  # Shape (N, 8, 3)
+        won = (lines == player).all(axis=2).any(axis=1) & (self.sgw[games, subgrids] == 0)
+        self.sgw[games[won], subgrids[won]] = player
+
+        # Check the overall winner of the games whose move won a subgrid
+        meta_lines = self.sgw[won][:, LINES_SG]
+        overall = (meta_lines == player).all(axis=2).any(axis=1) & (self.winner[won] == 0)
+        self.winner[games[won][overall]] = player
+
+        # Send the next move to the subgrid picked by each move, or free play if it is full or won
+        next_sg = _CELL_TO_NEXT_SG_ARRAY[moves]
+        full = (self.board[games[:, None], _SUBGRID_CELLS[next_sg]] != 0).all(axis=1)
+        closed = full | (self.sgw[games, next_sg] != 0)
+        self.next_sg = np.where(closed, -1, next_sg).astype(np.int8)
@@ -0,0 +1,127 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# board_core.pyx
+# Native move application for Board. Build in place with: cythonize -i board_core.pyx
+from libc.stdint cimport int8_t, uint32_t, uint64_t
+
+# Same subgrid-major layout as board.py, with each 81-bit bitboard split on a
+# subgrid boundary: subgrids 0-6 (bits 0-62) in a uint64 and subgrids 7-8 in a uint32.
+cdef enum:
+    LO_SUBGRIDS = 7
+    LO_BITS = 63
+    SG_FULL_MASK = 0x1FF
+
+LO_MASK = 0x7FFF_FFFF_FFFF_FFFF  # The low LO_BITS bits
+
+cdef struct State:
+    uint64_t p1_lo, p2_lo
+    uint32_t p1_hi, p2_hi
+    uint32_t sgw_packed  # 2 bits per subgrid, as Board.sgw_packed
+    int8_t next_sg  # -1 = free move
+
+# The 8 winning lines of a subgrid as 9-bit masks (rows, columns, diagonals),
+# and the same lines spread onto the 2-bit-per-subgrid layout of sgw_packed
+cdef uint32_t SUBGRID_LINES[8]
+SUBGRID_LINES[:] = [0x1C0, 0x038, 0x007, 0x124, 0x092, 0x049, 0x111, 0x054]
+cdef uint32_t SGW_LINES[8]
+cdef int CELL_TO_BIT[81]
+
+
+def _init_tables():
+    cdef int i, k, row, col
+    for i in range(8):
+        SGW_LINES[i] = 0
+        for k in range(9):
+            if (SUBGRID_LINES[i] >> k) & 1:
+                SGW_LINES[i] |= 1 << (2 * k)
+    for row in range(9):
+        for col in range(9):
+            CELL_TO_BIT[row * 9 + col] = ((row // 3) * 3 + col // 3) * 9 + (row % 3) * 3 + col % 3
+
+
+_init_tables()
+
+
+cdef inline uint32_t subgrid_bits(uint64_t lo, uint32_t hi, int subgrid_index) noexcept nogil:
+    # 9-bit slice of a split bitboard for one subgrid
+    if subgrid_index < LO_SUBGRIDS:
+        return <uint32_t>((lo >> (9 * subgrid_index)) & SG_FULL_MASK)
+    return (hi >> (9 * (subgrid_index - LO_SUBGRIDS))) & SG_FULL_MASK
+
+
+cdef inline bint has_line(uint32_t bits, const uint32_t* lines) noexcept nogil:
+    cdef int i
+    for i in range(8):
+        if bits & lines[i] == lines[i]:
+            return True
+    return False
+
+
+cdef int apply_move_state(State* s, int index, int player) noexcept nogil:
+    """
+    Apply a legal move at flat index (0-80) for player (1 or 2) in place.
+    Returns the player if the move completes a line of won subgrids, otherwise 0.
+    The move can only complete one if it won its subgrid. The caller decides whether
+    the game was already won.
+    """
+    cdef int bit = CELL_TO_BIT[index]
+    cdef int subgrid_index = bit // 9
+    cdef int local_index = bit % 9
+    cdef uint32_t player_bits
+    cdef bint won = False
+
+    # Place the stone
+    if bit < LO_BITS:
+        if player == 1:
+            s.p1_lo |= (<uint64_t>1) << bit
+        else:
+            s.p2_lo |= (<uint64_t>1) << bit
+    else:
+        if player == 1:
+            s.p1_hi |= (<uint32_t>1) << (bit - LO_BITS)
+        else:
+            s.p2_hi |= (<uint32_t>1) << (bit - LO_BITS)
+
+    # Only the mover can complete a line, and decided subgrids stay decided
+    if (s.sgw_packed >> (2 * subgrid_index)) & 3 == 0:
+        if player == 1:
+            player_bits = subgrid_bits(s.p1_lo, s.p1_hi, subgrid_index)
+        else:
+            player_bits = subgrid_bits(s.p2_lo, s.p2_hi, subgrid_index)
+        if has_line(player_bits, SUBGRID_LINES):
+            s.sgw_packed |= (<uint32_t>player) << (2 * subgrid_index)
+            won = True
+
+    # The local position of the move selects the next subgrid
+    if (subgrid_bits(s.p1_lo | s.p2_lo, s.p1_hi | s.p2_hi, local_index) == SG_FULL_MASK
+            or (s.sgw_packed >> (2 * local_index)) & 3):
+        s.next_sg = -1
+    else:
+        s.next_sg = local_index
+
+    # The overall winner can only change when this move won its subgrid
+    if won and has_line(s.sgw_packed >> (player - 1), SGW_LINES):
+        return player
+    return 0
+
+
+def apply_move(bits_p1, bits_p2, sgw_packed, int index, int player):
+    """
+    Apply a legal move at flat index (0-80) for player (1 or 2) to Board state.
+    Returns (bits_p1, bits_p2, sgw_packed, next_subgrid, winner), where next_subgrid
+    is -1 for a free move. winner is the player if the move completes a line of won subgrids,
+    otherwise 0. It is only the game's winner if the game was still undecided; Board keeps the first one.
+    """
+    cdef State s
+    cdef int winner
+    s.p1_lo = bits_p1 & LO_MASK
+    s.p1_hi = bits_p1 >> LO_BITS
+    s.p2_lo = bits_p2 & LO_MASK
+    s.p2_hi = bits_p2 >> LO_BITS
+    s.sgw_packed = sgw_packed
+    s.next_sg = -1
+
+    winner = apply_move_state(&s, index, player)
+
+    return ((<object>s.p1_hi << LO_BITS) | s.p1_lo,
+            (<object>s.p2_hi << LO_BITS) | s.p2_lo,
+            s.sgw_packed, s.next_sg, winner)
@@ -0,0 +1,153 @@
+# board_numba.py
+import numpy as np
+from numba import njit
+
+from board import CELL_TO_BIT, SG_FULL_MASK, SUBGRID_LINES
+
+# numba cannot hold the 81-bit Python integers used by Board, so each player's
+# bitboard is split on a subgrid boundary: subgrids 0-6 (bits 0-62) go into a
+# "lo" int64 and subgrids 7-8 (bits 63-80) into a "hi" int64.
+LO_SUBGRIDS = 7
+LO_BITS = 9 * LO_SUBGRIDS
+LO_MASK = (1 << LO_BITS) - 1
+
+_CELL_TO_BIT = np.array(CELL_TO_BIT, dtype=np.int64)
+_SUBGRID_LINES = np.array(SUBGRID_LINES, dtype=np.int64)
+
+
+def split_bits(bits):
+    """
+    Split an 81-bit bitboard into the (lo, hi) pair used by the numba kernels.
+    """
+    return bits & LO_MASK, bits >> LO_BITS
+
+
+def join_bits(lo, hi):
+    """
+    Join a (lo, hi) pair back into an 81-bit bitboard.
+    """
+    return int(lo) | (int(hi) << LO_BITS)
+
+
+def state_from_board(board):
+    """
+    Export a Board as the split state tuple
+    (p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid) taken by apply_move and random_playout.
+    """
+    p1_lo, p1_hi = split_bits(board.bits[0])
+    p2_lo, p2_hi = split_bits(board.bits[1])
+    next_subgrid = -1 if board.next_subgrid is None else board.next_subgrid
+    subgrid_wins = board.subgrid_wins
+    sgw_p1 = sum(1 << k for k, winner in enumerate(subgrid_wins) if winner == 1)
+    sgw_p2 = sum(1 << k for k, winner in enumerate(subgrid_wins) if winner == 2)
+    return p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid
+
+
+@njit(cache=True)
+def _subgrid_bits(lo, hi, subgrid_index):
+    # 9-bit slice of a split bitboard for one subgrid
+    if subgrid_index < LO_SUBGRIDS:
+        return (lo >> (9 * subgrid_index)) & SG_FULL_MASK
+    return (hi >> (9 * (subgrid_index - LO_SUBGRIDS))) & SG_FULL_MASK
+
+
+@njit(cache=True)
+def _has_line(bits):
+    for line in _SUBGRID_LINES:
+        if bits & line == line:
+            return True
+    return False
+
+
+@njit(cache=True)
+def _apply_bit(p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, bit, player):
+    # Place the stone
+    if bit < LO_BITS:
+        if player == 1:
+            p1_lo |= np.int64(1) << bit
+        else:
+            p2_lo |= np.int64(1) << bit
+    else:
+        if player == 1:
+            p1_hi |= np.int64(1) << (bit - LO_BITS)
+        else:
+            p2_hi |= np.int64(1) << (bit - LO_BITS)
+
+    # Only the mover can complete a line, and decided subgrids stay decided
+    subgrid_index = bit // 9
+    won = False
+    if ((sgw_p1 | sgw_p2) >> subgrid_index) & 1 == 0:
+        if player == 1:
+            if _has_line(_subgrid_bits(p1_lo, p1_hi, subgrid_index)):
+                sgw_p1 |= 1 << subgrid_index
+                won = True
+        else:
+            if _has_line(_subgrid_bits(p2_lo, p2_hi, subgrid_index)):
+                sgw_p2 |= 1 << subgrid_index
+                won = True
+
+    # The local position of the move selects the next subgrid (-1 = free move)
+    next_subgrid = bit % 9
+    occupied = _subgrid_bits(p1_lo | p2_lo, p1_hi | p2_hi, next_subgrid)
+    if occupied == SG_FULL_MASK or ((sgw_p1 | sgw_p2) >> next_subgrid) & 1:
+        next_subgrid = -1
+
+    # Only a move that won its subgrid can complete a line of won subgrids
+    winner = 0
+    if won and _has_line(sgw_p1 if player == 1 else sgw_p2):
+        winner = player
+
+    return p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid, winner
+
+
+@njit(cache=True)
+def apply_move(p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid, index, player):
+    """
+    Apply a move at flat index (0-80) for player (1 or 2) to a split state, as returned by
+    state_from_board. The move is not validated, so the incoming next_subgrid is not used.
+    Returns the new state followed by the winner flag
+    (p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid, winner),
+    so that *state, winner = apply_move(*state, index, player) can be repeated;
+    next_subgrid is -1 for a free move. winner is player if this move completed a line
+    of won subgrids, otherwise 0. It is the game's winner only if the game was still undecided,
+    so a caller that plays on after a win must keep the first non-zero winner itself.
+    """
+    return _apply_bit(p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, _CELL_TO_BIT[index], player)
+
+
+@njit(cache=True)
+def random_playout(p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid, player):
+    """
+    Play uniformly random moves from a split state until the game ends,
+    starting with player. Returns the winner (1 or 2), or 0 for a draw.
+    Seed it with numba's generator via seed().
+    """
+    moves = np.empty(81, dtype=np.int64)
+    while True:
+        # Collect the empty bits of the allowed subgrid(s)
+        count = 0
+        first = 0 if next_subgrid < 0 else next_subgrid
+        last = 9 if next_subgrid < 0 else next_subgrid + 1
+        for subgrid_index in range(first, last):
+            occupied = _subgrid_bits(p1_lo | p2_lo, p1_hi | p2_hi, subgrid_index)
+            for local_index in range(9):
+                if (occupied >> local_index) & 1 == 0:
+                    moves[count] = 9 * subgrid_index + local_index
+                    count += 1
+        if count == 0:
+            return 0
+
+        bit = moves[np.random.randint(count)]
+        p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, next_subgrid, winner = _apply_bit(
+            p1_lo, p1_hi, p2_lo, p2_hi, sgw_p1, sgw_p2, bit, player)
+        if winner:
+            return winner
+        player = 3 - player
+
+
+@njit(cache=True)
+def seed(value):
+    """
+    Seed the random generator used inside the numba kernels.
+    """
+    np.random.seed(value)
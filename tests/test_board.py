@@ -0,0 +1,309 @@
+# test_board.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import board as board_module
+from board import BatchedBoards, Board, SUBGRID_LINES, subgrid_winners
+
+
+def random_games(n_games, seed=0):
+    """
+    Play n_games random games to the end with update_cell_unchecked, yielding
+    (board, index, player) after every move.
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(n_games):
+        board = Board()
+        player = 1
+        moves = list(board.legal_moves())
+        while moves:
+            index = int(rng.choice(moves))
+            board.update_cell_unchecked(index, player)
+            yield board, index, player
+            player = 3 - player
+            moves = list(board.legal_moves())
+
+
+def test_batched_boards_match_board_in_lockstep():
+    """
+    Play random games in BatchedBoards and in one Board per game side by side, continuing
+    after a game is won, and check that both hold the same state after every move.
+    """
+    n = 64
+    rng = np.random.default_rng(0)
+    batched = BatchedBoards(n)
+    boards = [Board() for _ in range(n)]
+    player = 1
+
+    for _ in range(400):
+        legal = batched.legal_mask()
+        for i, board in enumerate(boards):
+            expected = np.zeros(81, dtype=bool)
+            expected[list(board.legal_moves())] = True
+            assert (legal[i] == expected).all()
+
+        # Start a new game wherever no move is left
+        finished = ~legal.any(axis=1)
+        if finished.any():
+            batched.reset(finished)
+            for i in np.flatnonzero(finished):
+                boards[i] = Board()
+            legal = batched.legal_mask()
+
+        moves = (rng.random(legal.shape) * legal).argmax(axis=1)
+        batched.apply(moves, player)
+        for i, board in enumerate(boards):
+            board.update_cell_unchecked(int(moves[i]), player)
+            assert (batched.board[i].reshape(9, 9) == board.board).all()
+            assert list(batched.sgw[i]) == board.subgrid_wins
+            assert batched.winner[i] == board.overall_winner
+            expected_next = -1 if board.next_subgrid is None else board.next_subgrid
+            assert batched.next_sg[i] == expected_next
+        player = 3 - player
+
+
+def test_first_overall_winner_is_final():
+    """
+    A line of won subgrids completed after the game is decided does not change the winner.
+    """
+    board = Board()
+    for subgrid_index in (0, 3, 6):  # Left column of subgrids for Player 2
+        board._sgw_set(subgrid_index, 2)
+    assert board.check_winner(2)
+
+    for subgrid_index in (1, 4, 7):  # Middle column of subgrids for Player 1
+        board._sgw_set(subgrid_index, 1)
+    assert not board.check_winner(1)
+    assert board.overall_winner == 2
+
+
+def test_is_valid_move_rejects_cells_outside_the_board():
+    board = Board()
+    for row, col in ((0, 9), (9, 0), (-1, 0), (0, -1)):
+        with pytest.raises(IndexError):
+            board.is_valid_move(row, col)
+
+
+def test_numpy_player_values_keep_python_int_state():
+    """
+    A player value given as a numpy scalar must not turn the packed state into a fixed-width int.
+    """
+    board = Board()
+    player_2 = np.uint8(2)
+    for index, value in ((54, player_2), (18, 1), (55, player_2), (21, 1), (56, player_2)):
+        board.update_cell(index, value)
+
+    assert board.subgrid_wins[6] == 2
+    assert type(board.sgw_packed) is int
+    assert type(board.overall_winner) is int
+
+
+def test_subgrid_winners_matches_board_without_contested_subgrids():
+    """
+    subgrid_winners agrees with Board.subgrid_wins wherever no subgrid has a line of both players.
+    """
+    checked = 0
+    for board, _, _ in random_games(100):
+        contested = False
+        for subgrid_index in range(9):
+            p1_bits, p2_bits = board.get_subgrid_bits(subgrid_index)
+            p1_line = any(p1_bits & line == line for line in SUBGRID_LINES)
+            p2_line = any(p2_bits & line == line for line in SUBGRID_LINES)
+            contested = contested or (p1_line and p2_line)
+        if contested:
+            continue
+        assert list(subgrid_winners(board.board)) == board.subgrid_wins
+        checked += 1
+    assert checked > 1000
+
+
+def test_numba_kernels_match_board_in_lockstep():
+    """
+    Chain board_numba.apply_move through full random games, starting from
+    state_from_board, and compare it with Board after every move.
+    """
+    board_numba = pytest.importorskip("board_numba")
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        board = Board()
+        state = board_numba.state_from_board(board)
+        first_winner = 0
+        player = 1
+        moves = list(board.legal_moves())
+        while moves:
+            index = int(rng.choice(moves))
+            board.update_cell_unchecked(index, player)
+            *state, winner = board_numba.apply_move(*state, index, player)
+            first_winner = first_winner or winner
+            assert tuple(state) == board_numba.state_from_board(board)
+            assert first_winner == board.overall_winner
+            player = 3 - player
+            moves = list(board.legal_moves())
+
+
+def test_numba_random_playout():
+    """
+    random_playout finishes games from Board positions, is reproducible when seeded,
+    and lets either player win.
+    """
+    board_numba = pytest.importorskip("board_numba")
+    board = Board()
+    board.update_cell(40, 1)
+    state = board_numba.state_from_board(board)
+
+    board_numba.seed(0)
+    results = [board_numba.random_playout(*state, 2) for _ in range(200)]
+    board_numba.seed(0)
+    assert [board_numba.random_playout(*state, 2) for _ in range(200)] == results
+    assert set(results) <= {0, 1, 2}
+    assert 1 in results and 2 in results
+
+    # Player 2 holds subgrids 0 and 3, and the only legal move completes subgrid 6 and the game
+    board = Board()
+    for subgrid_index in (0, 3):
+        board._sgw_set(subgrid_index, 2)
+    board.bits[1] = 0b000_000_011 << 54  # Player 2: local cells 0 and 1 of subgrid 6
+    board.bits[0] = 0b111_111_000 << 54  # Player 1: the rest of subgrid 6 except local cell 2
+    board.next_subgrid = 6
+    state = board_numba.state_from_board(board)
+    assert board_numba.random_playout(*state, 2) == 2
+
+
+def test_core_apply_move_matches_pure_python(monkeypatch):
+    """
+    When board_core is built it replaces the pure Python move path, so both must agree move for move.
+    """
+    core_apply_move = board_module._core_apply_move
+    if core_apply_move is None:
+        pytest.skip("board_core is not built")
+    monkeypatch.setattr(board_module, "_core_apply_move", None)  # Boards below use the pure Python path
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        board = Board()
+        bits_p1 = bits_p2 = sgw_packed = 0
+        first_winner = 0
+        player = 1
+        moves = list(board.legal_moves())
+        while moves:
+            index = int(rng.choice(moves))
+            board.update_cell_unchecked(index, player)
+            bits_p1, bits_p2, sgw_packed, next_subgrid, winner = core_apply_move(
+                bits_p1, bits_p2, sgw_packed, index, player)
+            first_winner = first_winner or winner
+            assert (bits_p1, bits_p2, sgw_packed) == (board.bits[0], board.bits[1], board.sgw_packed)
+            assert next_subgrid == (-1 if board.next_subgrid is None else board.next_subgrid)
+            assert first_winner == board.overall_winner
+            player = 3 - player
+            moves = list(board.legal_moves())
+
+
+def test_unmake_move_restores_every_ply():
+    """
+    Play random games to the end with make_move, then unwind them and check that
+    every earlier position comes back, including its winner and legal moves.
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        board = Board()
+        player = 1
+        snapshots = []
+        while True:
+            legal_mask = board.legal_mask()
+            snapshots.append((board.freeze(), board.overall_winner, legal_mask))
+            if not legal_mask:
+                break
+            board.make_move(int(rng.choice(list(board.legal_moves()))), player)
+            player = 3 - player
+
+        assert (board.freeze(), board.overall_winner, board.legal_mask()) == snapshots.pop()
+        while snapshots:
+            board.unmake_move()
+            assert (board.freeze(), board.overall_winner, board.legal_mask()) == snapshots.pop()
+        assert board.history == []
+        assert board == Board()
+
+
+def test_equality_and_freeze():
+    """
+    Boards compare by position, freeze() gives a hashable key for it, and Board itself is unhashable.
+    """
+    board = Board()
+    other = Board()
+    assert board == other
+    assert board != 1
+
+    board.update_cell(40, 1)
+    assert board != other
+    other.make_move(40, 1)
+    assert board == other
+    assert {board.freeze(): 1}[other.freeze()] == 1
+
+    with pytest.raises(TypeError):
+        hash(board)
+
+    # The same subgrids and stones with a different first winner is a different position
+    for subgrid_index in (0, 3, 6):
+        board._sgw_set(subgrid_index, 2)
+        other._sgw_set(subgrid_index, 2)
+    board.overall_winner = 2
+    assert board != other
+    assert board.freeze() != other.freeze()
+
+
+def test_targeted_subgrid_check_keeps_a_decided_winner():
+    """
+    Checking the last move of a subgrid that is already won does not hand it to the mover.
+    """
+    board = Board()
+    board.bits[0] = 0b000_000_111  # Player 1 holds the top row of subgrid 0
+    board.bits[1] = 0b111_000_000  # Player 2 holds the bottom row of subgrid 0
+    board._sgw_set(0, 1)
+    assert board.check_subgrid_winner(0, 7, 2) is None
+    assert board.subgrid_wins[0] == 1
+
+
+def test_update_cell_matches_unchecked_on_legal_moves():
+    """
+    The validated and unvalidated move paths produce the same position on legal moves.
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        checked = Board()
+        unchecked = Board()
+        player = 1
+        moves = list(checked.legal_moves())
+        while moves:
+            index = int(rng.choice(moves))
+            checked.update_cell(index, player)
+            unchecked.update_cell_unchecked(index, player)
+            assert checked == unchecked
+            player = 3 - player
+            moves = list(checked.legal_moves())
+
+
+def test_update_cell_rejects_invalid_moves():
+    board = Board()
+    board.update_cell(40, 1)  # Sends the next move to subgrid 4
+
+    with pytest.raises(ValueError):
+        board.update_cell(40, 2)  # Occupied
+    with pytest.raises(ValueError):
+        board.update_cell(0, 2)  # Outside the required subgrid
+    for index in (-1, 81):
+        with pytest.raises(ValueError):
+            board.update_cell(index, 2)  # Outside the board
+    with pytest.raises(ValueError):
+        board.update_cell(30, 3)  # Not a player
+    with pytest.raises(ValueError):
+        board.update_cell_in_subgrid(9, 0, 2)  # No such subgrid
+
+    # Rejected moves leave the position untouched
+    expected = Board()
+    expected.update_cell(40, 1)
+    assert board == expected